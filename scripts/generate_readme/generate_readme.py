@@ -1,9 +1,11 @@
 import argparse
-import datefinder
+import hashlib
 import json
-import magic
+import olefile
 import os
+import re
 
+from datetime import datetime
 from jinja2 import Environment, FileSystemLoader
 from urllib.parse import urlparse
 
@@ -12,40 +14,79 @@
     loader=FileSystemLoader("templates")
 )
 
+def get_info_file_path(file_path: str) -> str:
+    return os.path.join(os.path.dirname(file_path), 'info.json')
+
+
+def get_fingerprints_file_path(file_path: str) -> str:
+    """
+    The fingerprints are cached outside info.json, which is rewritten by the fetch step and is a trigger path
+    of the convert workflow.
+    """
+    return os.path.join(os.path.dirname(file_path), 'fingerprints.json')
+
+
+def load_json(json_file_path: str) -> dict:
+    if os.path.isfile(json_file_path):
+        with open(json_file_path, 'r') as jfile:
+            return json.load(jfile)
+    return {}
+
+
+def get_content_hash(file_path: str) -> str:
+    content_hash = hashlib.sha256()
+    with open(file_path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(1 << 16), b''):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
 def get_source_file_properties(file_path: str) -> dict:
-    file_header_info = magic.from_file(file_path)
-    file_header_info.split(',')
-    file_properties = dict([(kv[0].strip(),kv[1].strip())  for kv in map(lambda x: x.split(':', 1), file_header_info.split(',')) if len(kv) == 2])
+    if not olefile.isOleFile(file_path):
+        return {}
+
+    with olefile.OleFileIO(file_path) as ole_file:
+        summary_information = ole_file.get_metadata()
 
     computed_properties = {}
-    if 'Last Saved Time/Date' in file_properties:
-        last_saved_at = list(datefinder.find_dates(file_properties['Last Saved Time/Date']))[0]
-        computed_properties['last_updated_at'] = last_saved_at.strftime('%Y-%m-%d')
-    
-    if 'Create Time/Date' in file_properties:
-        created_at = list(datefinder.find_dates(file_properties['Create Time/Date']))[0]
-        computed_properties['created_at'] = created_at.strftime('%Y-%m-%d')
-    
+    if summary_information.last_saved_time:
+        computed_properties['last_updated_at'] = summary_information.last_saved_time.strftime('%Y-%m-%d')
+
+    if summary_information.create_time:
+        computed_properties['created_at'] = summary_information.create_time.strftime('%Y-%m-%d')
+
     return computed_properties
 
 
-def get_download_url(file_path: str) -> str:
-    info_file_path = os.path.join(os.path.dirname(file_path), 'info.json')
-    if os.path.isfile(info_file_path):
-        with open(info_file_path, 'r') as ifile:
-            download_url = json.load(ifile).get('download_url')
-            download_url_properties = { 'original_dataset_download_url': download_url }
-            if download_url:
-                original_filename = os.path.basename(urlparse(download_url).path)
-                filename_date_claim = list(datefinder.find_dates(original_filename))
-                if len(filename_date_claim) > 0:
-                    return { **download_url_properties, 'claimed_fresh_at': filename_date_claim[0].strftime('%Y-%m-%d') }
+def get_download_url(info: dict) -> dict:
+    download_url = info.get('download_url')
+    if download_url:
+        download_url_properties = {'original_dataset_download_url': download_url}
+        original_filename = os.path.basename(urlparse(download_url).path)
+        filename_date_claim = re.search(r'(\d{2})\.(\d{2})\.(\d{4})', original_filename)
+        if filename_date_claim:
+            day, month, year = filename_date_claim.groups()
+            try:
+                claimed_fresh_at = datetime(int(year), int(month), int(day))
+            except ValueError:
+                return download_url_properties
+            return {**download_url_properties, 'claimed_fresh_at': claimed_fresh_at.strftime('%Y-%m-%d')}
+        return download_url_properties
     return {}
 
 
 def get_fingerprints(file_path: str) -> dict:
-    source_file_properties = get_source_file_properties(file_path)
-    download_url = get_download_url(file_path)
+    content_hash = get_content_hash(file_path)
+    cached_fingerprints = load_json(get_fingerprints_file_path(file_path))
+
+    if content_hash in cached_fingerprints:
+        source_file_properties = cached_fingerprints[content_hash]
+    else:
+        source_file_properties = get_source_file_properties(file_path)
+        with open(get_fingerprints_file_path(file_path), 'w') as ffile:
+            json.dump({content_hash: source_file_properties}, ffile, indent=2)
+
+    download_url = get_download_url(load_json(get_info_file_path(file_path)))
     return {**source_file_properties, **download_url}
 
 
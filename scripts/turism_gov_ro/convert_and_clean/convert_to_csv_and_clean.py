@@ -5,14 +5,15 @@
 
 from collections import namedtuple
 from enum import Enum
-from functools import reduce
+from functools import partial, reduce
+from gazetteer import Gazetteer
 from unidecode import unidecode
 from typing import Callable, Tuple, Type, List
 
 CLEANING_RULE = Enum('CLEANING_RULE', 'CONVERT_CHARS REMOVE_EXTRA_END_SPACES REMOVE_EXTRA_END_QUOTES '
                                       'REMOVE_SPACES_AFTER_QUOTES CORRECT_STICKY_DASHES REMOVE_MULTI_WHITESPACE '
                                       'EXPAND_ABBREVIATIONS CORRECT_WORDS CORRECT_NAMES FORMAT_PARENTHESIS '
-                                      'ADD_SPACE_AFTER_DOT')
+                                      'ADD_SPACE_AFTER_DOT CANONICALIZE_NAMES')
 
 Cleaned = namedtuple('Cleaned', 'nr certificate_number registration_date name administrator location county')
 Errors = namedtuple('Errors', 'certificate_number column correction')
@@ -114,14 +115,12 @@ def remove_multi_whitespaces(column_value: str) -> str:
     return ' '.join(column_value.split())
 
 
-def correct_names(value: str) -> str:
-    return replace(value, {
-        'Caras - Severin': 'Caraș-Severin',
-        'Bistrita - Nasaud': 'Bistrița-Năsăud',
-        'Satu - Mare': 'Satu Mare',
-        'Cluj Napoca': 'Cluj-Napoca',
-        'Cluj - Napoca': 'Cluj-Napoca'
-    })
+def correct_names(gazetteer: Gazetteer, value: str) -> str:
+    return gazetteer.replace(value, kinds=('county', 'locality'), aliases_only=True)
+
+
+def canonicalize_names(gazetteer: Gazetteer, kinds: Tuple[str, ...], value: str) -> str:
+    return gazetteer.canonicalize(value, kinds=kinds)
 
 
 def convert_chars(columns_value: str):
@@ -169,7 +168,10 @@ def correct_words(value: str) -> str:
     })
 
 
-def clean_string_column(value: str) -> Tuple[str, List[Type[CLEANING_RULE]]]:
+def clean_string_column(value: str, gazetteer: Gazetteer,
+                        canonical_kinds: Tuple[str, ...] = ()) -> Tuple[str, List[Type[CLEANING_RULE]]]:
+    names = (partial(canonicalize_names, gazetteer, canonical_kinds), CLEANING_RULE.CANONICALIZE_NAMES) \
+        if canonical_kinds else (partial(correct_names, gazetteer), CLEANING_RULE.CORRECT_NAMES)
     return clean_column([
         (convert_chars, CLEANING_RULE.CONVERT_CHARS),
         (add_space_after_dot, CLEANING_RULE.ADD_SPACE_AFTER_DOT),
@@ -181,7 +183,7 @@ def clean_string_column(value: str) -> Tuple[str, List[Type[CLEANING_RULE]]]:
         (remove_multi_whitespaces, CLEANING_RULE.REMOVE_MULTI_WHITESPACE),
         (expand_abbreviations, CLEANING_RULE.EXPAND_ABBREVIATIONS),
         (correct_words, CLEANING_RULE.CORRECT_WORDS),
-        (correct_names, CLEANING_RULE.CORRECT_NAMES),
+        names,
         (remove_multi_whitespaces, CLEANING_RULE.REMOVE_MULTI_WHITESPACE),
         (remove_extra_end_spaces, CLEANING_RULE.REMOVE_EXTRA_END_SPACES),
     ], value)
@@ -192,16 +194,17 @@ def clean_column(cleaning_functions: Tuple[Callable[[str], str], Type[CLEANING_R
     return reduce(lambda x, y: validate_with(y, x), cleaning_functions, (column_value, []))
 
 
-def clean(source_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def clean(source_df: pd.DataFrame, gazetteer: Gazetteer) -> Tuple[pd.DataFrame, pd.DataFrame]:
     print('Sanitizing the data.')
 
     errors = []
     cleaned_rows = []
     for row in source_df.dropna().itertuples(index=False):
-        s_name, name_errors = clean_string_column(row.name)
-        s_administrator, administrator_errors = clean_string_column(row.administrator)
-        s_location, location_errors = clean_string_column(row.location)
-        s_county, county_errors = clean_string_column(row.county)
+        s_name, name_errors = clean_string_column(row.name, gazetteer)
+        s_administrator, administrator_errors = clean_string_column(row.administrator, gazetteer)
+        s_location, location_errors = clean_string_column(row.location, gazetteer,
+                                                          canonical_kinds=('massif', 'locality'))
+        s_county, county_errors = clean_string_column(row.county, gazetteer, canonical_kinds=('county',))
         s_certificate_number = re.match(r'^(\d+)', str(row.certificate_number)).group() if str(
             row.certificate_number) else row.certificate_number
 
@@ -239,7 +242,11 @@ def clean(source_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
                 required=True,
                 type=click.Path(exists=False, dir_okay=False, writable=True))
 @click.option('--sheet-name', '-s', default=0, type=int, help="The name of the sheet to convert.")
-def convert_and_clean(xls_file, csv_file, sheet_name):
+@click.option('--gazetteer-file', '-g',
+              default='data/gazetteer/ro_gazetteer.csv',
+              type=click.Path(exists=True, dir_okay=False, readable=True),
+              help="The gazetteer of canonical counties, massifs and localities.")
+def convert_and_clean(xls_file, csv_file, sheet_name, gazetteer_file):
     """
     Convert the the xls to csv and write a clean-ish copy to the destination folder.
     """
@@ -272,7 +279,10 @@ def convert_and_clean(xls_file, csv_file, sheet_name):
         'Judeţ': 'county'
     }, inplace=True)
 
-    cleaned_df, errors_df = clean(source_df)
+    print(f'Loading the gazetteer from {gazetteer_file}.')
+    gazetteer = Gazetteer.load(gazetteer_file)
+
+    cleaned_df, errors_df = clean(source_df, gazetteer)
 
     errors_file_name = f'{os.path.splitext(csv_file)[0]}.error.csv'
     print(f'Writing the errors file to {errors_file_name}.')
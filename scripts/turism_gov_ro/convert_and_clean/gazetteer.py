@@ -0,0 +1,239 @@
+import csv
+import re
+import sys
+
+from collections import deque, namedtuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from unidecode import unidecode
+
+KINDS = ('county', 'massif', 'locality')
+GENERIC_HEADS = ('muntii', 'masivul', 'muntele', 'piemontul')
+
+Entry = namedtuple('Entry', 'kind canonical')
+Match = namedtuple('Match', 'start end entry alias')
+
+
+def fold(value: str) -> Tuple[str, List[int]]:
+    """
+    Fold the diacritics and the case of the value, keeping for every folded char the index of the original
+    char it came from so that matches can be mapped back onto the original value.
+    """
+    folded = []
+    index = []
+    for i, char in enumerate(value):
+        for f_char in unidecode(char).lower():
+            folded.append(f_char)
+            index.append(i)
+    return ''.join(folded), index
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, a_char in enumerate(a, 1):
+        current = [i]
+        for j, b_char in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a_char != b_char)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def distinctive(folded: str) -> str:
+    """
+    Drop the generic head word of a folded name, "muntii rodnei" is told apart from "muntii retezat" by "rodnei".
+    """
+    head, _, rest = folded.partition(' ')
+    return rest if head in GENERIC_HEADS and rest else folded
+
+
+class Gazetteer:
+    """
+    An Aho-Corasick automaton over the diacritic folded canonical names and aliases of the gazetteer.
+    A cell is canonicalized in a single scan, independently of the number of entries.
+    The cell aliases, like a bare "Retezat", are too broad for free text and only stand for a whole cell part.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, List[str], List[str]]], fuzzy_prefix: int = 3):
+        self.fuzzy_prefix = fuzzy_prefix
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, Entry, bool]]] = [[]]
+        self.prefixes: Dict[str, List[Tuple[str, Entry]]] = {}
+        self.cell_aliases: Dict[str, Entry] = {}
+
+        for kind, canonical, aliases, cell_aliases in entries:
+            entry = Entry(kind=kind, canonical=canonical)
+            folded_canonical, _ = fold(canonical)
+            for name in [canonical] + aliases:
+                folded, _ = fold(name)
+                self._add(folded, entry, folded != folded_canonical)
+                token = distinctive(folded)
+                self.prefixes.setdefault(token[:fuzzy_prefix], []).append((token, entry))
+            for name in cell_aliases:
+                self.cell_aliases[fold(name)[0]] = entry
+        self._link()
+
+    @classmethod
+    def load(cls, path: str) -> 'Gazetteer':
+        with open(path, 'r', encoding='utf-8', newline='') as gazetteer_file:
+            return cls([
+                (row['kind'], row['canonical'],
+                 [a for a in row['aliases'].split('|') if a], [a for a in row['cell_aliases'].split('|') if a])
+                for row in csv.DictReader(gazetteer_file)
+            ])
+
+    def _add(self, folded: str, entry: Entry, alias: bool):
+        state = 0
+        for char in folded:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state].append((len(folded), entry, alias))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, value: str, kinds: Iterable[str] = KINDS, aliases_only: bool = False) -> List[Match]:
+        """
+        Return the leftmost longest, non overlapping, whole word matches of the gazetteer names in the value.
+        With aliases_only the names which fold to their canonical name are skipped, so that free text
+        like "Piatra Albă" is not taken for the county "Alba".
+        """
+        folded, index = fold(value)
+        candidates = []
+        state = 0
+        for end, char in enumerate(folded, 1):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, entry, alias in self.output[state]:
+                start = end - length
+                if entry.kind in kinds and (alias or not aliases_only) \
+                        and is_boundary(folded, start - 1) and is_boundary(folded, end):
+                    candidates.append((start, end, entry, alias))
+
+        matches = []
+        last_end = 0
+        for start, end, entry, alias in sorted(candidates, key=lambda c: (c[0], c[0] - c[1])):
+            if start >= last_end:
+                matches.append(Match(start=index[start], end=index[end - 1] + 1, entry=entry, alias=alias))
+                last_end = end
+        return matches
+
+    def replace(self, value: str, kinds: Iterable[str] = KINDS, aliases_only: bool = False) -> str:
+        new_value = []
+        s_i = 0
+        for match in self.find(value, kinds, aliases_only):
+            new_value.append(value[s_i:match.start])
+            new_value.append(match.entry.canonical)
+            s_i = match.end
+        new_value.append(value[s_i:])
+        return ''.join(new_value)
+
+    def closest(self, value: str, kinds: Iterable[str] = KINDS) -> Optional[Entry]:
+        """
+        Return the entry closest to the value by the edit distance of the distinctive token, only looking
+        at the names which share its folded prefix. Ties between different entries give no entry.
+        Tokens of up to 8 chars must match exactly once folded, "tarcau" and "tarcu" are different ranges.
+        """
+        folded, _ = fold(value)
+        token = distinctive(folded)
+        limit = 0 if len(token) <= 8 else 1 if len(token) <= 12 else 2
+        best = {}
+        for name, entry in self.prefixes.get(token[:self.fuzzy_prefix], []):
+            if entry.kind not in kinds:
+                continue
+            distance = edit_distance(token, name, limit)
+            if distance <= limit:
+                best[entry] = min(distance, best.get(entry, distance))
+        if not best:
+            return None
+        distances = sorted(best.items(), key=lambda b: b[1])
+        if len(distances) > 1 and distances[0][1] == distances[1][1]:
+            return None
+        return distances[0][0]
+
+    def canonicalize(self, value: str, kinds: Iterable[str] = KINDS) -> str:
+        """
+        Canonicalize the matches of a single scan of the value, falling back on the cell aliases and then on
+        the closest entry for the comma separated parts without a match. The separators and the spacing around
+        the parts are kept.
+        """
+        matches = self.find(value, kinds)
+        new_value = []
+        s_i = 0
+        m_i = 0
+        for part in re.finditer(r'[^,]+', value):
+            part_matches = []
+            while m_i < len(matches) and matches[m_i].start < part.end():
+                part_matches.append(matches[m_i])
+                m_i += 1
+
+            if part_matches:
+                for match in part_matches:
+                    new_value.append(value[s_i:match.start])
+                    new_value.append(match.entry.canonical)
+                    s_i = match.end
+                continue
+
+            text = part.group().strip()
+            entry = self.cell_aliases.get(fold(text)[0]) if text else None
+            if entry is None or entry.kind not in kinds:
+                entry = self.closest(text, kinds) if text else None
+            if entry:
+                text_start = part.start() + part.group().index(text)
+                new_value.append(value[s_i:text_start])
+                new_value.append(entry.canonical)
+                s_i = text_start + len(text)
+        new_value.append(value[s_i:])
+        return ''.join(new_value)
+
+
+def is_boundary(folded: str, i: int) -> bool:
+    return i < 0 or i >= len(folded) or not folded[i].isalnum()
+
+
+if __name__ == '__main__':
+    gazetteer = Gazetteer.load('data/gazetteer/ro_gazetteer.csv')
+    location_kinds = ('massif', 'locality')
+    free_text_kinds = ('county', 'locality')
+    checks = [
+        (gazetteer.canonicalize('Masivul Ciucaș', location_kinds), 'Munții Ciucaș'),
+        (gazetteer.canonicalize('Muntii Baiului', location_kinds), 'Munții Baiului'),
+        (gazetteer.canonicalize('Munții Bihor - Vlădeasa', location_kinds), 'Munții Bihor - Vlădeasa'),
+        (gazetteer.canonicalize('Munții Căliman, Piemontul Călimanului', location_kinds),
+         'Munții Călimani, Piemontul Călimanului'),
+        (gazetteer.canonicalize('Retezat', location_kinds), 'Munții Retezat'),
+        (gazetteer.canonicalize('Vf. Retezat', location_kinds), 'Vf. Retezat'),
+        (gazetteer.canonicalize('Parcul Național Retezat', location_kinds), 'Parcul Național Retezat'),
+        (gazetteer.canonicalize('Piatra Albă', location_kinds), 'Piatra Albă'),
+        (gazetteer.canonicalize('Munții Oașului', location_kinds), 'Munții Oașului'),
+        (gazetteer.canonicalize('Munții Tarcău', location_kinds), 'Munții Tarcău'),
+        (gazetteer.canonicalize('Masivul Retezatul Mik', location_kinds), 'Masivul Retezatul Mic'),
+        (gazetteer.canonicalize('Munții Maramureșulu', location_kinds), 'Munții Maramureșului'),
+        (gazetteer.canonicalize('Prahova,Brasov,', ('county',)), 'Prahova,Brașov,'),
+        (gazetteer.canonicalize('Caras - Severin', ('county',)), 'Caraș-Severin'),
+        (gazetteer.replace('Poiana Albă - Cluj Napoca', free_text_kinds, aliases_only=True),
+         'Poiana Albă - Cluj-Napoca'),
+        (gazetteer.replace('Biserica Sf. Gheorghe', free_text_kinds, aliases_only=True), 'Biserica Sf. Gheorghe'),
+    ]
+    failed = [(value, expected) for value, expected in checks if value != expected]
+    for value, expected in failed:
+        print(f'Expected {expected!r}, got {value!r}.')
+    print(f'{len(checks) - len(failed)} of {len(checks)} gazetteer checks passed.')
+    sys.exit(1 if failed else 0)
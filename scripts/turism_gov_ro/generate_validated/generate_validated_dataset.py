@@ -1,26 +1,42 @@
 import click
 import os
 import pandas as pd
+import sys
 
 from unidecode import unidecode
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from partitioned_dataset import read_dataset, remove_partitioned, write_partitioned
+
 
 @click.command()
 @click.option('--input-path',
-              type=click.Path(exists=True, dir_okay=False, readable=True),
+              type=click.Path(exists=False, dir_okay=False, readable=True),
               default='data/clean/turism_gov_ro/verification/ttmo_gov_list.csv')
 @click.option('--output-path',
               type=click.Path(exists=False, dir_okay=False, readable=True),
               default='data/clean/turism_gov_ro/ttmo_gov_list.csv')
-def generate_validated_dataset(input_path, output_path):
-    ver_df = pd.read_csv(input_path, header=0)
-    validated_dataset = ver_df.loc[ver_df['verified']].drop(labels=['verified', 'source', 'commentary'], axis=1)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    validated_dataset.to_csv(output_path, index=False)
+@click.option('--partitioned/--no-partitioned', default=False,
+              help='Write the validated datasets partitioned by county, next to a manifest.')
+def generate_validated_dataset(input_path, output_path, partitioned):
+    ver_df = read_dataset(input_path, partitioned, header=0)
+    if ver_df is None:
+        raise click.BadParameter(f'Neither {input_path} nor its partitions exist.', param_hint='--input-path')
 
+    validated_dataset = ver_df.loc[ver_df['verified']].drop(labels=['verified', 'source', 'commentary'], axis=1)
     validated_dataset_ascii = validated_dataset.applymap(lambda v: unidecode(str(v)))
     (root, ext) = os.path.splitext(output_path)
+
+    if partitioned:
+        write_partitioned(validated_dataset, output_path)
+        write_partitioned(validated_dataset_ascii, f'{root}_ascii{ext}')
+        return
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    validated_dataset.to_csv(output_path, index=False)
     validated_dataset_ascii.to_csv(f'{root}_ascii{ext}', index=False)
+    remove_partitioned(output_path)
+    remove_partitioned(f'{root}_ascii{ext}')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,147 @@
+import hashlib
+import io
+import json
+import os
+import pandas as pd
+import re
+import unicodedata
+
+from typing import Iterable, Optional
+
+MANIFEST_FILE_NAME = 'manifest.json'
+UNKNOWN_PARTITION = 'unknown'
+
+
+def get_partitions_dir(path: str) -> str:
+    """
+    The partitions of data/x/dataset.csv are written to the data/x/dataset/ folder.
+    """
+    return os.path.splitext(path)[0]
+
+
+def get_manifest_path(path: str) -> str:
+    return os.path.join(get_partitions_dir(path), MANIFEST_FILE_NAME)
+
+
+def is_partitioned(path: str) -> bool:
+    return os.path.isfile(get_manifest_path(path))
+
+
+def load_manifest(path: str) -> dict:
+    if is_partitioned(path):
+        with open(get_manifest_path(path), 'r', encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    return {'partitions': {}}
+
+
+def remove_partitioned(path: str):
+    """
+    Remove the partitions and the manifest of the dataset, used when it is written as a single csv.
+    """
+    if not is_partitioned(path):
+        return
+    partitions_dir = get_partitions_dir(path)
+    for partition in load_manifest(path)['partitions'].values():
+        partition_path = os.path.join(partitions_dir, partition['path'])
+        if os.path.isfile(partition_path):
+            os.remove(partition_path)
+    os.remove(get_manifest_path(path))
+    if not os.listdir(partitions_dir):
+        os.rmdir(partitions_dir)
+
+
+def slugify(value: str) -> str:
+    ascii_value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', ascii_value.lower()).strip('-')
+
+
+def write_partitioned(df: pd.DataFrame, path: str, partition_by: str = 'county',
+                      sort_by: str = 'certificate_number') -> dict:
+    """
+    Write the dataset as one csv per value of the partition_by column, named after the content hash, along with
+    a manifest holding the row count, the hash and the sort_by range of every partition, and the dtypes the
+    single csv reads back with. The rows without a partition_by value go to the unknown partition.
+    Only the partitions whose content hash changed are written, the ones which disappeared are removed,
+    as is the single csv of the dataset.
+    """
+    partitions_dir = get_partitions_dir(path)
+    os.makedirs(partitions_dir, exist_ok=True)
+    old_partitions = load_manifest(path)['partitions']
+
+    partitions = {}
+    written = 0
+    for key, pdf in df.groupby(partition_by, sort=True, dropna=False):
+        key = UNKNOWN_PARTITION if pd.isna(key) else key
+        pdf = pdf.sort_values(by=sort_by, kind='stable', key=pd.to_numeric)
+        content = pdf.to_csv(index=False)
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        partition_file_name = f'{slugify(str(key))}-{content_hash[:12]}.csv'
+
+        old_partition = old_partitions.get(str(key))
+        partition_path = os.path.join(partitions_dir, partition_file_name)
+        if not old_partition or old_partition['sha256'] != content_hash or not os.path.isfile(partition_path):
+            with open(partition_path, 'w', encoding='utf-8', newline='') as partition_file:
+                partition_file.write(content)
+            written += 1
+
+        partitions[str(key)] = {
+            'path': partition_file_name,
+            'rows': len(pdf),
+            'sha256': content_hash,
+            sort_by: {'min': int(pd.to_numeric(pdf[sort_by]).min()), 'max': int(pd.to_numeric(pdf[sort_by]).max())}
+        }
+
+    partitioned_rows = sum(partition['rows'] for partition in partitions.values())
+    if partitioned_rows != len(df):
+        raise ValueError(f'Only {partitioned_rows} of the {len(df)} rows were partitioned by {partition_by}.')
+
+    for key, old_partition in old_partitions.items():
+        if partitions.get(key, {}).get('path') != old_partition['path']:
+            old_partition_path = os.path.join(partitions_dir, old_partition['path'])
+            if os.path.isfile(old_partition_path):
+                os.remove(old_partition_path)
+
+    dtypes = pd.read_csv(io.StringIO(df.to_csv(index=False))).dtypes
+    manifest = {
+        'partition_by': partition_by,
+        'sort_by': sort_by,
+        'dtypes': {column: str(dtype) for column, dtype in dtypes.items()},
+        'partitions': partitions
+    }
+    with open(get_manifest_path(path), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, ensure_ascii=False)
+
+    if os.path.isfile(path):
+        os.remove(path)
+
+    print(f'{written} of {len(partitions)} partitions written to {partitions_dir}.')
+    return manifest
+
+
+def read_dataset(path: str, partitioned: bool, **read_csv_args) -> Optional[pd.DataFrame]:
+    """
+    Read the dataset from whichever layout exists, preferring the partitioned one when asked for and both exist.
+    Return None when there is neither.
+    """
+    if is_partitioned(path) and (partitioned or not os.path.isfile(path)):
+        return read_partitioned(path, **read_csv_args)
+    if os.path.isfile(path):
+        return pd.read_csv(path, **read_csv_args)
+    return None
+
+
+def read_partitioned(path: str, keys: Optional[Iterable[str]] = None, **read_csv_args) -> pd.DataFrame:
+    """
+    Read the partitions of the dataset, all of them or only the ones for the given keys, with the dtypes
+    of the single csv so that the frame does not depend on the partitions selected.
+    """
+    manifest = load_manifest(path)
+    partitions = manifest['partitions']
+    selected = partitions.keys() if keys is None else [k for k in keys if k in partitions]
+    partitions_dir = get_partitions_dir(path)
+    read_csv_args = {**read_csv_args, 'dtype': {**manifest.get('dtypes', {}), **read_csv_args.get('dtype', {})}}
+    dfs = [pd.read_csv(os.path.join(partitions_dir, partitions[k]['path']), **read_csv_args) for k in selected]
+    if not dfs:
+        return pd.DataFrame()
+    return pd.concat(dfs, ignore_index=True).sort_values(by=manifest['sort_by'], kind='stable', ignore_index=True,
+                                                         key=pd.to_numeric)
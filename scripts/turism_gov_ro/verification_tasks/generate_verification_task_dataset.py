@@ -1,10 +1,14 @@
 import click
 import os
 import pandas as pd
+import sys
 
 from dataclasses import dataclass
 from jinja2 import Environment, FileSystemLoader
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from partitioned_dataset import read_dataset, remove_partitioned, write_partitioned
+
 
 @dataclass
 class VerificationTask:
@@ -31,18 +35,20 @@ class VerificationTask:
               default='data/clean/turism_gov_ro/verification/ttmo_gov_list.csv',
               type=click.Path(exists=False, dir_okay=False, readable=True, writable=True))
 @click.option('--issue-md-output-path', default='issue.md')
-def generate_verification_tasks(ttmo_gov_list_path, ttmo_gov_list_old_path, output_path, issue_md_output_path):
+@click.option('--partitioned/--no-partitioned', default=False,
+              help='Write the verification tasks partitioned by county, next to a manifest.')
+def generate_verification_tasks(ttmo_gov_list_path, ttmo_gov_list_old_path, output_path, issue_md_output_path,
+                                partitioned):
     undf = pd.read_csv(ttmo_gov_list_path)
+    vtdf = read_dataset(output_path, partitioned)
 
-    if os.path.isfile(output_path):
+    if vtdf is not None:
         uodf = pd.read_csv(ttmo_gov_list_old_path)
 
         mudf = undf.merge(uodf, how='outer', on='certificate_number', suffixes=('_new', '_old'), indicator='merge')
         mudf['nr_new'] = mudf['nr_new'].astype('Int64')
         mudf['nr_old'] = mudf['nr_old'].astype('Int64')
 
-        vtdf = pd.read_csv('data/clean/turism_gov_ro/verification/ttmo_gov_list.csv')
-
         nvts = []
         removed = []
         new = []
@@ -121,13 +127,13 @@ def generate_verification_tasks(ttmo_gov_list_path, ttmo_gov_list_old_path, outp
                 removed.append(uodf[uodf['certificate_number'] == row.certificate_number].iloc[0])
 
         nvtdf = pd.DataFrame(nvts)
-        write_verification_file(nvtdf, output_path)
+        write_verification_file(nvtdf, output_path, partitioned)
         write_issue_markdown(pd.DataFrame(new), pd.DataFrame(removed), modified, issue_md_output_path)
     else:
         undf['verified'] = 'False'
         undf['source'] = undf['certificate_number']
         undf['commentary'] = None
-        write_verification_file(undf, output_path)
+        write_verification_file(undf, output_path, partitioned)
 
 
 def write_issue_markdown(ndf, rdf, n_modif, issue_md_output_path):
@@ -147,9 +153,14 @@ def write_issue_markdown(ndf, rdf, n_modif, issue_md_output_path):
             issue_file.write(template.render(**template_vars))
 
 
-def write_verification_file(df, output_path):
+def write_verification_file(df, output_path, partitioned=False):
+    if partitioned:
+        write_partitioned(df, output_path)
+        return
+
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     df.sort_values(by='certificate_number', kind='stable').to_csv(output_path, index=False)
+    remove_partitioned(output_path)
 
 
 if __name__ == '__main__':